@@ -1,13 +1,8 @@
 import streamlit as st
 import uuid
-from main import run_agent
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.graph import StateGraph, END
-from state import AgentState
-from nodes.trainer import collect_profile, search_exercises, process_resources, create_schedule, assess_feasibility, update_constraints
-from nodes.nutrition_plan import generate_nutrition
-from nodes.save_plan import save_plan
-import os
+from main import build_graph
+from nodes.progression import expand_week
+from plan_writer import PLAN_FORMATS, plan_path, render_plan
 
 # Page Config
 st.set_page_config(page_title="AI Fitness Coach", page_icon="🏋️ ", layout="wide")
@@ -40,51 +35,19 @@ if "schedule" not in st.session_state:
 if "nutrition" not in st.session_state:
     st.session_state.nutrition = None
 
+if "program" not in st.session_state:
+    st.session_state.program = None
+
+if "save_result" not in st.session_state:
+    st.session_state.save_result = None
+
 if "app" not in st.session_state:
     pass
 
-# Graph Definition (Same as main.py but adapted for Streamlit)
+# Graph Definition (shared with main.py)
 @st.cache_resource
 def get_graph():
-    workflow = StateGraph(AgentState)
-    workflow.add_node("collect_profile", collect_profile)
-    workflow.add_node("search_exercises", search_exercises)
-    workflow.add_node("process_resources", process_resources)
-    workflow.add_node("assess_feasibility", assess_feasibility)
-    workflow.add_node("create_schedule", create_schedule)
-    workflow.add_node("generate_nutrition", generate_nutrition)
-    workflow.add_node("update_constraints", update_constraints)
-    workflow.add_node("save_plan", save_plan)
-
-    workflow.set_entry_point("collect_profile")
-    workflow.add_edge("collect_profile", "search_exercises")
-    workflow.add_edge("search_exercises", "process_resources")
-    workflow.add_edge("process_resources", "assess_feasibility")
-    workflow.add_edge("assess_feasibility", "create_schedule")
-    workflow.add_edge("assess_feasibility", "generate_nutrition")
-    workflow.add_edge("generate_nutrition", "save_plan")
-
-    def check_feedback(state: AgentState):
-        feedback = state.get("feedback", "")
-        if feedback == "approve":
-            return "save_plan"
-        return "update_constraints"
-
-    workflow.add_conditional_edges(
-        "create_schedule",
-        check_feedback,
-        {
-            "save_plan": "save_plan",
-            "update_constraints": "update_constraints"
-        }
-    )
-    
-    workflow.add_edge("update_constraints", "assess_feasibility")
-    workflow.add_edge("save_plan", END)
-
-    memory = MemorySaver()
-    app = workflow.compile(checkpointer=memory, interrupt_after=["create_schedule"])
-    return app
+    return build_graph()
 
 app = get_graph()
 config = {"configurable": {"thread_id": st.session_state.thread_id}}
@@ -130,6 +93,8 @@ if start_btn:
         if snapshot.values.get("schedule"):
             st.session_state.schedule = snapshot.values["schedule"]
             st.session_state.nutrition = snapshot.values.get("nutrition")
+            st.session_state.program = None
+            st.session_state.save_result = None
             st.session_state.needs_review = True
         else:
             st.error("Failed to generate schedule.")
@@ -170,17 +135,17 @@ if st.session_state.get("needs_review"):
     
     with col_approve:
         if st.button("✅ Approve Plan"):
-            with st.spinner("Saving plan..."):
+            with st.spinner("Building your long-term program and saving the plan..."):
                 app.update_state(config, {"feedback": "approve"}, as_node="create_schedule")
                 for event in app.stream(None, config=config):
                     pass
                 st.session_state.needs_review = False
-                st.success("Plan saved to `workout_plan.md`!")
                 
-                # Read and display the file content
-                if os.path.exists("workout_plan.md"):
-                    with open("workout_plan.md", "r") as f:
-                        st.download_button("Download Plan", f, file_name="workout_plan.md")
+                # save_plan reports the outcome through feedback
+                snapshot = app.get_state(config)
+                st.session_state.save_result = snapshot.values.get("feedback") or ""
+                st.session_state.program = snapshot.values.get("program")
+                st.rerun()
 
     with col_modify:
         feedback_text = st.text_input("Request Changes (e.g., 'less days', 'more cardio')")
@@ -199,3 +164,37 @@ if st.session_state.get("needs_review"):
                         st.rerun()
             else:
                 st.warning("Please enter feedback first.")
+
+# Saved plan: rendered outside the Approve button so downloads survive reruns
+if st.session_state.save_result is not None:
+    result = st.session_state.save_result
+    if result.startswith("Successfully"):
+        st.success(f"Plan saved to `{plan_path(st.session_state.thread_id)}`!")
+        # Render downloads from this thread's state, not from a shared file
+        values = app.get_state(config).values
+        for col, (fmt, mime) in zip(st.columns(len(PLAN_FORMATS)), PLAN_FORMATS.items()):
+            with col:
+                st.download_button(
+                    f"Download Plan (.{fmt})",
+                    render_plan(values, fmt, st.session_state.thread_id),
+                    file_name=f"workout_plan.{fmt}",
+                    mime=mime,
+                    key=f"download_{fmt}",
+                )
+    else:
+        st.error(result or "Plan could not be saved.")
+
+# Long-term program is generated on approval
+program = st.session_state.program
+if program:
+    st.subheader(f"Long-Term Program ({program.total_weeks} weeks)")
+    st.write(" → ".join(
+        f"**{p.name}** (wk {p.start_week}-{p.start_week + p.weeks - 1})" for p in program.phases
+    ))
+    week = st.number_input("Preview Week", min_value=1, max_value=program.total_weeks, value=1)
+    week_plan = expand_week(program, week)
+    st.info(week_plan.notes)
+    for workout in week_plan.workouts:
+        with st.expander(f"**{workout.day}** ({workout.duration})"):
+            for exercise in workout.exercises:
+                st.write(f"- {exercise}")
@@ -0,0 +1,72 @@
+import os
+from functools import lru_cache
+from langchain_openai import ChatOpenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Model tiers. "local" points at any OpenAI-compatible server (e.g. Ollama, vLLM)
+# so cheap extraction steps can run without hitting the hosted API.
+MODEL_TIERS = {
+    "fast": {"model": "gpt-4o-mini"},
+    "strong": {"model": "gpt-4o"},
+    "local": {
+        "model": os.getenv("LOCAL_LLM_MODEL", "llama3.1"),
+        "base_url": os.getenv("LOCAL_LLM_BASE_URL", "http://localhost:11434/v1"),
+        "api_key": os.getenv("LOCAL_LLM_API_KEY", "local"),
+    },
+}
+
+# Per-node routing with latency (timeout, seconds per attempt) and cost (max_tokens) budgets.
+# The OpenAI client retries timeouts as well as 429/5xx, so only the last model in a
+# route's chain gets `retries`; every earlier model fails over after one attempt.
+# Worst case for a hung route is timeout * (len(fallbacks) + 1 + retries).
+MODEL_ROUTES = {
+    "collect_profile": {"tier": "fast", "timeout": 15, "max_tokens": 500, "retries": 1, "fallbacks": ["strong"]},
+    "update_constraints": {"tier": "fast", "timeout": 15, "max_tokens": 500, "retries": 1, "fallbacks": ["strong"]},
+    "process_resources": {"tier": "fast", "timeout": 20, "max_tokens": 400, "retries": 2, "fallbacks": ["strong"]},
+    "assess_feasibility": {"tier": "fast", "timeout": 30, "max_tokens": 500, "retries": 2, "fallbacks": ["strong"]},
+    "create_schedule": {"tier": "strong", "timeout": 60, "max_tokens": 2000, "retries": 2, "fallbacks": ["fast"]},
+    "program_skeleton": {"tier": "strong", "timeout": 30, "max_tokens": 600, "retries": 1, "fallbacks": ["fast"]},
+    "program_progression": {"tier": "fast", "timeout": 20, "max_tokens": 300, "retries": 1, "fallbacks": ["strong"]},
+    "program_phase": {"tier": "fast", "timeout": 45, "max_tokens": 1500, "retries": 1, "fallbacks": ["strong"]},
+    "generate_nutrition": {"tier": "fast", "timeout": 30, "max_tokens": 1000, "retries": 1, "fallbacks": ["strong"]},
+}
+
+DEFAULT_ROUTE = {"tier": "fast", "timeout": 30, "max_tokens": 1000, "retries": 2, "fallbacks": []}
+
+
+def get_route(node: str) -> dict:
+    """Returns the route for a node, applying env overrides like MODEL_TIER_CREATE_SCHEDULE=local."""
+    route = dict(MODEL_ROUTES.get(node, DEFAULT_ROUTE))
+    tier = os.getenv(f"MODEL_TIER_{node.upper()}")
+    if tier in MODEL_TIERS:
+        route["tier"] = tier
+    timeout = os.getenv(f"MODEL_TIMEOUT_{node.upper()}")
+    if timeout:
+        route["timeout"] = float(timeout)
+    return route
+
+
+def _build_model(tier: str, route: dict, retries: int):
+    return ChatOpenAI(
+        temperature=0,
+        timeout=route["timeout"],
+        max_tokens=route["max_tokens"],
+        max_retries=retries,
+        **MODEL_TIERS[tier],
+    )
+
+
+@lru_cache(maxsize=None)
+def get_llm(node: str):
+    """Returns the chat model for a node, wrapped with its fallback models."""
+    route = get_route(node)
+    tiers = [route["tier"]] + [tier for tier in route["fallbacks"] if tier != route["tier"]]
+    models = [
+        _build_model(tier, route, route["retries"] if i == len(tiers) - 1 else 0)
+        for i, tier in enumerate(tiers)
+    ]
+    if len(models) == 1:
+        return models[0]
+    return models[0].with_fallbacks(models[1:])
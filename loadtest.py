@@ -0,0 +1,291 @@
+"""Load test: drives many concurrent review/revise sessions through the compiled graph.
+
+All external backends (chat models, Tavily search, OpenAI embeddings) are replaced
+with local fakes that sleep to simulate latency, so the run is free. Session scripts
+(revision counts and feedback) are derived from --seed and repeat exactly; latency
+jitter uses its own generator and depends on thread scheduling.
+Each session embeds a unique marker (e.g. 'session-0007') in its goal; any other
+session's marker showing up in its final state or saved plan is reported as a leak.
+
+Usage: python loadtest.py --sessions 50 --concurrency 50 --latency-ms 50
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# The real clients validate API keys at import time
+os.environ.setdefault("OPENAI_API_KEY", "sk-loadtest")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-loadtest")
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+import nodes.nutrition_plan
+import nodes.progression
+import nodes.trainer
+import plan_writer
+from llm_config import get_route
+from main import build_graph
+
+MARKER = re.compile(r"session-\d{4}")
+FEEDBACK = ["more days", "less time per day", "add a rest day", "only bodyweight exercises", "harder workouts"]
+
+# Relative latency of each model tier compared to --latency-ms
+TIER_LATENCY = {"fast": 1.0, "strong": 3.0, "local": 0.5}
+
+# Kept apart from the per-session script generators so jitter never shifts them
+jitter = random.Random()
+
+
+def _goal(text: str) -> str:
+    match = re.search(r'"goal":\s*"([^"]*)"', text) or re.search(r"Goal: (.*?)\. Current Level", text)
+    return match.group(1) if match else "unknown goal"
+
+
+def _workouts(goal: str, days: int) -> list:
+    return [
+        {"day": f"Day {i + 1}", "exercises": [f"Skill work for {goal}", "Pushups 3x10"], "duration": "30 mins"}
+        for i in range(days)
+    ]
+
+
+def _fake_response(node: str, text: str) -> dict:
+    """Returns a plausible structured answer for the prompt a node sends."""
+    goal = _goal(text)
+    if node == "collect_profile":
+        return {"goal": goal, "current_fitness": "5 pullups", "time_per_day": 30, "days_per_week": 3, "equipment": []}
+    if node == "update_constraints":
+        profile = json.loads(re.search(r"Current Profile:\n(.*?)\n\nUser Feedback", text, re.S).group(1))
+        profile["days_per_week"] = min(profile["days_per_week"] + 1, 7)
+        return profile
+    if node == "assess_feasibility":
+        return {"estimated_time": "3-4 months", "is_feasible": True, "reason": f"Steady progress towards {goal}"}
+    if node == "create_schedule":
+        days = int(re.search(r'"days_per_week":\s*(\d+)', text).group(1))
+        return {"workouts": _workouts(goal, days), "notes": f"Focus on {goal}", "estimated_time": "3-4 months"}
+    if node == "program_skeleton":
+        return {"phases": [
+            {"name": "Foundation", "weeks": 6, "focus": "Base strength"},
+            {"name": "Strength", "weeks": 6, "focus": "Heavier progressions"},
+            {"name": "Skill", "weeks": 6, "focus": f"Practice {goal}"},
+        ]}
+    if node == "program_progression":
+        return {"progression": "+1 rep per set each week", "deload_last_week": True}
+    if node == "program_phase":
+        return {"workouts": _workouts(goal, 3), "progression": "+1 rep per set each week", "deload_last_week": True}
+    if node == "generate_nutrition":
+        return {
+            "diet_type": "High Protein",
+            "daily_calories": 2400,
+            "macros": "30% Protein, 45% Carbs, 25% Fat",
+            "meal_suggestions": [f"Oats and eggs before training for {goal}"],
+            "hydration_tips": "Drink 3L of water per day.",
+        }
+    raise KeyError(node)
+
+
+def fake_get_llm(latency: float):
+    """Returns a get_llm() replacement whose models answer from _fake_response after a delay."""
+    def get_llm(node: str):
+        tier = get_route(node)["tier"]
+
+        def call(prompt):
+            time.sleep(latency * TIER_LATENCY.get(tier, 1.0) * jitter.uniform(0.5, 1.5))
+            text = prompt.to_string()
+            if node == "process_resources":
+                # Echo the retrieved context so documents from other sessions are visible
+                return AIMessage(content=f"Form tips from: {text.split('Text:', 1)[-1].strip()}")
+            return AIMessage(content=json.dumps(_fake_response(node, text)))
+
+        return RunnableLambda(call)
+
+    return get_llm
+
+
+def fake_web_search(latency: float):
+    """Returns an object with an invoke() matching tools.web_search."""
+    def search(query):
+        time.sleep(latency * jitter.uniform(0.5, 1.5))
+        session = MARKER.search(query)
+        tag = session.group() if session else "anonymous"
+        return [
+            {"url": f"https://example.com/{tag}/{i}", "content": f"Keep your core tight ({tag}, tip {i})"}
+            for i in range(3)
+        ]
+
+    return RunnableLambda(search)
+
+
+def install_fakes(latency: float, output_dir: str):
+    fake_llm = fake_get_llm(latency)
+    nodes.trainer.get_llm = fake_llm
+    nodes.nutrition_plan.get_llm = fake_llm
+    nodes.progression.get_llm = fake_llm
+    nodes.trainer.web_search = fake_web_search(latency)
+    nodes.trainer.embeddings = DeterministicFakeEmbedding(size=64)
+    plan_writer.PLAN_OUTPUT_DIR = output_dir
+
+
+def run_session(app, index: int, seed: int, max_revisions: int, latencies: dict, lock: threading.Lock) -> dict:
+    """Start -> 0..max_revisions revisions -> approve, mirroring the Streamlit buttons."""
+    rng = random.Random(seed + index)
+    marker = f"session-{index:04d}"
+    thread_id = str(uuid.uuid4())
+    config = {"configurable": {"thread_id": thread_id}}
+    result = {"marker": marker, "thread_id": thread_id, "error": None, "leaks": set()}
+
+    def timed(step, fn):
+        start = time.perf_counter()
+        fn()
+        with lock:
+            latencies[step].append(time.perf_counter() - start)
+
+    try:
+        initial_state = {
+            "user_input": (
+                f"Goal: 1 muscleup [{marker}]. Current Level: 5 pullups. "
+                f"Time: 30 mins/day. Days: 3 days/week. Equipment: pullup bar."
+            ),
+            "iteration_count": 0,
+            "resources": [],
+            "include_youtube": True,
+        }
+        timed("start", lambda: app.invoke(initial_state, config=config))
+
+        for _ in range(rng.randint(0, max_revisions)):
+            feedback = rng.choice(FEEDBACK)
+
+            def revise():
+                app.update_state(config, {"feedback": feedback}, as_node="create_schedule")
+                app.invoke(None, config=config)
+
+            timed("revise", revise)
+
+        def approve():
+            app.update_state(config, {"feedback": "approve"}, as_node="create_schedule")
+            app.invoke(None, config=config)
+
+        timed("approve", approve)
+
+        # Leak check: everything this session can see must carry only its own marker
+        values = app.get_state(config).values
+        seen = plan_writer.render_plan(values, "json")
+        path = plan_writer.plan_path(thread_id)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                seen += f.read()
+        else:
+            result["error"] = f"plan file missing: {path}"
+        result["leaks"] = set(MARKER.findall(seen)) - {marker}
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _rss_mb() -> float:
+    """Current resident set size of the process, including native (Chroma/sqlite) memory."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return _peak_rss_mb()  # No /proc (e.g. macOS): fall back to the peak
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50, help="Number of sessions to simulate.")
+    parser.add_argument("--concurrency", type=int, default=50, help="Sessions running at the same time.")
+    parser.add_argument("--max-revisions", type=int, default=3, help="Maximum revisions per session.")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Base latency of fake backends.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for session scripts.")
+    parser.add_argument(
+        "--tracemalloc", action="store_true",
+        help="Also trace Python heap allocations (slows every allocation, so latencies get worse).",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Show node output instead of silencing it.")
+    args = parser.parse_args()
+
+    jitter.seed(args.seed)
+    output_dir = tempfile.mkdtemp(prefix="loadtest_plans_")
+    install_fakes(args.latency_ms / 1000, output_dir)
+    app = build_graph()  # One shared graph and MemorySaver, like the Streamlit app
+
+    latencies = {"start": [], "revise": [], "approve": []}
+    lock = threading.Lock()
+
+    rss_before = _rss_mb()
+    if args.tracemalloc:
+        tracemalloc.start()
+    wall_start = time.perf_counter()
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet, ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(
+            lambda i: run_session(app, i, args.seed, args.max_revisions, latencies, lock), range(args.sessions)
+        ))
+    wall = time.perf_counter() - wall_start
+    rss_after = _rss_mb()
+    if args.tracemalloc:
+        heap_current, heap_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    errors = [r for r in results if r["error"]]
+    leaks = [r for r in results if r["leaks"]]
+    steps = sum(len(v) for v in latencies.values())
+    checkpointed = len(getattr(app.checkpointer, "storage", {}))
+
+    print(f"Sessions: {args.sessions} (concurrency {args.concurrency}, latency {args.latency_ms:.0f} ms)")
+    print(f"Wall time: {wall:.2f}s")
+    print(f"Throughput: {len(results) / wall:.2f} sessions/s, {steps / wall:.2f} steps/s")
+    for step, values in latencies.items():
+        print(
+            f"  {step:<8} n={len(values):<4} p50={_percentile(values, 50):.3f}s "
+            f"p95={_percentile(values, 95):.3f}s p99={_percentile(values, 99):.3f}s "
+            f"max={max(values, default=0):.3f}s"
+        )
+    print(
+        f"Memory: RSS {rss_before:.1f} -> {rss_after:.1f} MB (+{rss_after - rss_before:.1f} MB), "
+        f"peak {_peak_rss_mb():.1f} MB, {checkpointed} threads held in MemorySaver"
+    )
+    if args.tracemalloc:
+        print(f"Python heap: {heap_current / 1e6:.1f} MB traced, peak {heap_peak / 1e6:.1f} MB")
+    print(f"Errors: {len(errors)}")
+    for r in errors[:10]:
+        print(f"  {r['marker']}: {r['error']}")
+    print(f"Cross-session leaks: {len(leaks)}")
+    for r in leaks[:10]:
+        print(f"  {r['marker']} saw data from {', '.join(sorted(r['leaks']))}")
+    print(f"Plans written to {output_dir}")
+
+    sys.exit(1 if errors or leaks else 0)
+
+
+if __name__ == "__main__":
+    main()
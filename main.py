@@ -4,13 +4,15 @@ from langgraph.graph import StateGraph, END
 from state import AgentState
 from nodes.trainer import collect_profile, search_exercises, process_resources, create_schedule, assess_feasibility, update_constraints
 from nodes.nutrition_plan import generate_nutrition
+from nodes.progression import create_program
 from nodes.save_plan import save_plan
 import subprocess
 import base64
 import requests
 load_dotenv()
 
-def run_agent(user_input: str, include_youtube: bool = False, thread_id: str = "1"):
+def build_graph(checkpointer=None):
+    """Builds and compiles the coach graph (shared by the CLI, the Streamlit app and the load test)."""
     # Define Graph
     workflow = StateGraph(AgentState)
 
@@ -21,6 +23,7 @@ def run_agent(user_input: str, include_youtube: bool = False, thread_id: str = "
     workflow.add_node("assess_feasibility", assess_feasibility)
     workflow.add_node("create_schedule", create_schedule)
     workflow.add_node("generate_nutrition", generate_nutrition)
+    workflow.add_node("create_program", create_program)
     workflow.add_node("update_constraints", update_constraints)
     workflow.add_node("save_plan", save_plan)
 
@@ -34,32 +37,39 @@ def run_agent(user_input: str, include_youtube: bool = False, thread_id: str = "
     workflow.add_edge("assess_feasibility", "create_schedule")
     workflow.add_edge("assess_feasibility", "generate_nutrition")
     
-    # Nutrition flows to save_plan directly
-    workflow.add_edge("generate_nutrition", "save_plan")
+    # Nutrition finishes in the same step as the schedule, so it is in state by review time
+    workflow.add_edge("generate_nutrition", END)
     
     # Conditional Edge Logic
     def check_feedback(state: AgentState):
         feedback = state.get("feedback", "")
         if feedback == "approve":
-            return "save_plan"
+            return "create_program"
         return "update_constraints"
 
     workflow.add_conditional_edges(
         "create_schedule",
         check_feedback,
         {
-            "save_plan": "save_plan",
+            "create_program": "create_program",
             "update_constraints": "update_constraints"
         }
     )
     
+    # Multi-week program is built once, from the approved schedule, off the review path
+    workflow.add_edge("create_program", "save_plan")
+    
     workflow.add_edge("update_constraints", "assess_feasibility") # Cycle back to re-assess
     workflow.add_edge("save_plan", END)
 
     
     # Compile with Checkpointer and Interrupt
-    memory = MemorySaver()
-    app = workflow.compile(checkpointer=memory, interrupt_after=["create_schedule"])
+    memory = checkpointer or MemorySaver()
+    return workflow.compile(checkpointer=memory, interrupt_after=["create_schedule"])
+
+
+def run_agent(user_input: str, include_youtube: bool = False, thread_id: str = "1"):
+    app = build_graph()
 
     # Save Graph Image
     try:
@@ -142,6 +152,10 @@ def run_agent(user_input: str, include_youtube: bool = False, thread_id: str = "
             app.update_state(config, {"feedback": "approve"}, as_node="create_schedule")
             # Resume execution
             app.invoke(None, config=config) 
+            program = app.get_state(config).values.get("program")
+            if program:
+                phases = " -> ".join(f"{p.name} ({p.weeks} wks)" for p in program.phases)
+                print(f"Long-Term Program ({program.total_weeks} weeks): {phases}")
             break # Done
         else:
             print("Requesting changes...")
@@ -34,3 +34,33 @@ class NutritionPlan(BaseModel):
     macros: str = Field(description="Macronutrient split (e.g., 40% Protein, 30% Carbs, 30% Fat).")
     meal_suggestions: List[str] = Field(description="List of meal suggestions.")
     hydration_tips: str = Field(description="Hydration advice.")
+
+class PhaseOutline(BaseModel):
+    name: str = Field(description="Name of the training phase (e.g., 'Foundation', 'Strength', 'Skill').")
+    weeks: int = Field(description="Number of weeks in this phase.")
+    focus: str = Field(description="Main training focus of the phase.")
+
+class ProgramSkeleton(BaseModel):
+    phases: List[PhaseOutline] = Field(description="Ordered list of training phases (mesocycles) leading to the goal.")
+
+class PhaseProgression(BaseModel):
+    progression: str = Field(description="How to progress the week during the phase (e.g., '+1 rep per set each week').")
+    deload_last_week: bool = Field(default=False, description="True if the last week of the phase is a deload week.")
+
+class PhaseWorkouts(BaseModel):
+    workouts: List[DailyWorkout] = Field(description="Template week of workouts repeated during the phase.")
+    progression: str = Field(description="How to progress each week of the phase (e.g., '+1 rep per set each week').")
+    deload_last_week: bool = Field(default=False, description="True if the last week of the phase is a deload week.")
+
+class ProgramPhase(BaseModel):
+    name: str = Field(description="Name of the training phase.")
+    focus: str = Field(description="Main training focus of the phase.")
+    start_week: int = Field(description="First week of the program covered by this phase (1-based).")
+    weeks: int = Field(description="Number of weeks in this phase.")
+    workouts: List[DailyWorkout] = Field(default_factory=list, description="Template week of workouts for the phase.")
+    progression: str = Field(default="", description="Weekly progression rule applied to the template week.")
+    deload_last_week: bool = Field(default=False, description="True if the last week of the phase is a deload week.")
+
+class Program(BaseModel):
+    total_weeks: int = Field(description="Total length of the program in weeks.")
+    phases: List[ProgramPhase] = Field(description="Ordered training phases; weeks are expanded on demand.")
@@ -1,15 +1,15 @@
 from state import AgentState
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from models import NutritionPlan
+from llm_config import get_llm
 
 def generate_nutrition(state: AgentState):
     """Generates a nutrition plan based on the profile."""
     print("--Generating Nutrition Plan")
     profile = state["profile"]
     
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    llm = get_llm("generate_nutrition")
     parser = PydanticOutputParser(pydantic_object=NutritionPlan)
     prompt = ChatPromptTemplate.from_template(
         "Generate a nutrition plan for a user with the following profile:\n"
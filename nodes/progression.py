@@ -0,0 +1,194 @@
+import re
+from operator import itemgetter
+from state import AgentState
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.runnables import RunnableParallel
+from models import PhaseOutline, ProgramSkeleton, PhaseProgression, PhaseWorkouts, ProgramPhase, Program, WeeklySchedule
+from llm_config import get_llm
+
+MAX_PROGRAM_WEEKS = 104 # Goals beyond 2 years are not feasible anyway
+MAX_PARALLEL_PHASES = 6
+
+UNIT_WEEKS = {"day": 1 / 7, "week": 1, "month": 52 / 12, "year": 52}
+
+# A number (or 'a'/'an') directly followed by a unit; rates like '3 days/week' are skipped
+DURATION = re.compile(
+    r"(?:(\d+(?:\.\d+)?)\s*|\b(an?)\s+)(day|week|month|year)s?\b(?!\s*/|\s+per\b)"
+)
+
+
+def estimate_weeks(estimated_time: str, default: int = 12) -> int:
+    """Converts an estimate like '4-5 months' into weeks.
+
+    Each number is paired with the unit that follows it. Parts joined with 'and'
+    ('1 year and 6 months') are added up; otherwise the upper bound of a range
+    ('6 months to 1 year') is used.
+    """
+    text = (estimated_time or "").lower()
+    durations = [
+        float(number) * UNIT_WEEKS[unit] if number else UNIT_WEEKS[unit]
+        for number, _, unit in DURATION.findall(text)
+    ]
+    if not durations:
+        return default
+    if re.search(r"\band\b|\bplus\b|\+", text):
+        weeks = round(sum(durations))
+    else:
+        weeks = round(max(durations))
+    return max(1, min(weeks, MAX_PROGRAM_WEEKS))
+
+
+def _fit_phases(outlines, total_weeks: int):
+    """Drops empty phases and stretches/trims the outline so it covers exactly total_weeks."""
+    outlines = [o for o in outlines if o.weeks > 0]
+    phases = []
+    start = 1
+    for i, outline in enumerate(outlines):
+        remaining = total_weeks - start + 1
+        if remaining <= 0:
+            break
+        weeks = remaining if i == len(outlines) - 1 else min(outline.weeks, remaining)
+        phases.append((outline, start, weeks))
+        start += weeks
+    return phases
+
+
+def create_program(state: AgentState):
+    """Generates a periodized multi-week program, one LLM call per phase run in parallel.
+
+    Runs after the user approves the weekly schedule, which becomes the template
+    week of the first phase so week 1 matches what the user reviewed.
+    """
+    print("--Creating Program")
+    profile = state["profile"]
+    assessment = state["assessment"]
+    schedule = state["schedule"]
+    total_weeks = estimate_weeks(assessment.estimated_time)
+
+    # 1. Shared skeleton: phase names, lengths and focus
+    skeleton_parser = PydanticOutputParser(pydantic_object=ProgramSkeleton)
+    skeleton_prompt = ChatPromptTemplate.from_template(
+        "Split a {total_weeks}-week training program into phases (mesocycles) for a user with the following profile:\n"
+        "{profile}\n\n"
+        "Estimated Time to Goal: {estimated_time}\n"
+        "Use 2-6 phases of 3-8 weeks each, building towards the goal. The phase lengths must add up to {total_weeks}.\n"
+        "{format_instructions}"
+    )
+    skeleton_chain = skeleton_prompt | get_llm("program_skeleton") | skeleton_parser
+
+    # 2. Phase details, generated concurrently. Phase 1 reuses the approved week as its
+    # template, so it only needs a progression rule; later phases need a full week.
+    progression_parser = PydanticOutputParser(pydantic_object=PhaseProgression)
+    progression_prompt = ChatPromptTemplate.from_template(
+        "The following approved week is the template for the first phase of a periodized program.\n"
+        "Profile: {profile}\n\n"
+        "Approved Week:\n{schedule}\n\n"
+        "Phase: {name} (weeks 1-{end_week}), focus: {focus}\n"
+        "Describe how to progress this week from week to week during the phase.\n"
+        "{format_instructions}"
+    )
+    progression_chain = progression_prompt | get_llm("program_progression") | progression_parser
+
+    phase_parser = PydanticOutputParser(pydantic_object=PhaseWorkouts)
+    phase_prompt = ChatPromptTemplate.from_template(
+        "Create the template training week for one phase of a periodized program for a user with the following profile:\n"
+        "{profile}\n\n"
+        "Approved Week 1 Schedule:\n{schedule}\n\n"
+        "Program Outline:\n{outline}\n\n"
+        "Current Phase: {name} (weeks {start_week}-{end_week}), focus: {focus}\n"
+        "Build on the approved week: keep the same number of training days and session length "
+        "from the profile, and progress the exercises towards the goal.\n"
+        "The week repeats for the whole phase, so describe how to progress it week to week.\n"
+        "{format_instructions}"
+    )
+    phase_chain = phase_prompt | get_llm("program_phase") | phase_parser
+
+    try:
+        skeleton = skeleton_chain.invoke({
+            "profile": profile.model_dump_json(),
+            "estimated_time": assessment.estimated_time,
+            "total_weeks": total_weeks,
+            "format_instructions": skeleton_parser.get_format_instructions()
+        })
+        fitted = _fit_phases(skeleton.phases, total_weeks)
+        if not fitted:
+            fitted = [(PhaseOutline(name="Main", weeks=total_weeks, focus=profile.goal), 1, total_weeks)]
+        outline = "\n".join(
+            f"- Weeks {start}-{start + weeks - 1}: {o.name} ({o.focus})" for o, start, weeks in fitted
+        )
+        (first, first_start, first_weeks), rest = fitted[0], fitted[1:]
+        generated = RunnableParallel(
+            first=itemgetter("first") | progression_chain,
+            rest=itemgetter("rest") | phase_chain.map(),
+        ).invoke({
+            "first": {
+                "profile": profile.model_dump_json(),
+                "schedule": schedule.model_dump_json(),
+                "name": first.name,
+                "focus": first.focus,
+                "end_week": first_weeks,
+                "format_instructions": progression_parser.get_format_instructions()
+            },
+            "rest": [
+                {
+                    "profile": profile.model_dump_json(),
+                    "schedule": schedule.model_dump_json(),
+                    "outline": outline,
+                    "name": o.name,
+                    "focus": o.focus,
+                    "start_week": start,
+                    "end_week": start + weeks - 1,
+                    "format_instructions": phase_parser.get_format_instructions()
+                }
+                for o, start, weeks in rest
+            ],
+        }, config={"max_concurrency": MAX_PARALLEL_PHASES})
+    except Exception as e:
+        print(f"Error creating program: {e}")
+        return {"program": None}
+
+    first_progression = generated["first"]
+    phases = [
+        ProgramPhase(
+            name=first.name,
+            focus=first.focus,
+            start_week=first_start,
+            weeks=first_weeks,
+            workouts=schedule.workouts,
+            progression=first_progression.progression,
+            deload_last_week=first_progression.deload_last_week,
+        )
+    ] + [
+        ProgramPhase(
+            name=o.name,
+            focus=o.focus,
+            start_week=start,
+            weeks=weeks,
+            workouts=d.workouts,
+            progression=d.progression,
+            deload_last_week=d.deload_last_week,
+        )
+        for (o, start, weeks), d in zip(rest, generated["rest"])
+    ]
+    return {"program": Program(total_weeks=total_weeks, phases=phases)}
+
+
+def expand_week(program: Program, week: int) -> WeeklySchedule:
+    """Expands a single program week (1-based) from its phase template."""
+    for phase in program.phases:
+        if phase.start_week <= week < phase.start_week + phase.weeks:
+            week_in_phase = week - phase.start_week + 1
+            if phase.deload_last_week and week_in_phase == phase.weeks:
+                notes = f"{phase.name} - Week {week_in_phase}/{phase.weeks} (deload): reduce volume by ~40%."
+            else:
+                notes = (
+                    f"{phase.name} - Week {week_in_phase}/{phase.weeks}: {phase.focus}. "
+                    f"Progression step {week_in_phase - 1}: {phase.progression}"
+                )
+            return WeeklySchedule(
+                workouts=phase.workouts,
+                notes=notes,
+                estimated_time=f"Week {week} of {program.total_weeks}",
+            )
+    raise ValueError(f"Week {week} is outside the program (1-{program.total_weeks}).")
@@ -1,4 +1,4 @@
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 from state import AgentState
 from tools import web_search
@@ -7,10 +7,10 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.documents import Document
 from models import UserProfile, WeeklySchedule, ExerciseResource, Assessment
+from llm_config import get_llm
 load_dotenv()
 
-# Initialize LLM and Embeddings
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+# Initialize Embeddings (chat models are routed per node, see llm_config.py)
 embeddings = OpenAIEmbeddings()
 
 def collect_profile(state: AgentState):
@@ -23,7 +23,7 @@ def collect_profile(state: AgentState):
         "User Input: {user_input}"
     )
 
-    chain = prompt | llm | parser
+    chain = prompt | get_llm("collect_profile") | parser
     try:
         profile = chain.invoke({
             "user_input": state["user_input"],
@@ -89,7 +89,7 @@ def process_resources(state: AgentState):
         "Based on the following text, extract 3 key form tips for {goal}.\n"
         "Text: {context}"
     )
-    tip_chain = tip_prompt | llm
+    tip_chain = tip_prompt | get_llm("process_resources")
     tips_response = tip_chain.invoke({"goal": profile.goal, "context": context})
     
     if resources:
@@ -120,7 +120,7 @@ def assess_feasibility(state: AgentState):
         "Is it achievable within 2 years with the given time constraints?\n"
         "{format_instructions}"
     )
-    chain = prompt | llm | parser
+    chain = prompt | get_llm("assess_feasibility") | parser
     assessment = chain.invoke({
         "profile": profile.model_dump_json(),
         "format_instructions": parser.get_format_instructions()
@@ -144,7 +144,7 @@ def create_schedule(state: AgentState):
         "{resources}\n\n"
         "{format_instructions}"
     )
-    chain = prompt | llm | parser
+    chain = prompt | get_llm("create_schedule") | parser
     schedule = chain.invoke({
         "profile": profile.model_dump_json(),
         "estimated_time": assessment.estimated_time,
@@ -173,7 +173,7 @@ def update_constraints(state: AgentState):
         "{format_instructions}"
     )
     
-    chain = prompt | llm | parser
+    chain = prompt | get_llm("update_constraints") | parser
     try:
         updated_profile = chain.invoke({
             "profile": profile.model_dump_json(),
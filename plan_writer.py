@@ -0,0 +1,224 @@
+import io
+import json
+import os
+import re
+import tempfile
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+PLAN_OUTPUT_DIR = os.getenv("PLAN_OUTPUT_DIR", "plans")
+PLAN_FORMATS = {"md": "text/markdown", "json": "application/json", "ics": "text/calendar"}
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+ICS_DAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+
+def plan_path(thread_id: str, fmt: str = "md") -> str:
+    """Returns the per-thread output path for a plan, e.g. plans/<thread_id>/workout_plan.md."""
+    safe_id = re.sub(r"[^A-Za-z0-9_-]", "_", str(thread_id)) or "default"
+    return os.path.join(PLAN_OUTPUT_DIR, safe_id, f"workout_plan.{fmt}")
+
+
+def iter_markdown(state):
+    """Yields the markdown plan section by section so it can be streamed to any writer."""
+    schedule = state["schedule"]
+    nutrition = state.get("nutrition")
+    profile = state.get("profile")
+
+    yield "# Weekly Workout Plan\n\n"
+    if profile:
+        yield f"**Goal:** {profile.goal}\n"
+    yield f"**Estimated Time:** {schedule.estimated_time}\n\n"
+
+    if nutrition:
+        yield (
+            "\n## Nutrition Plan\n"
+            f"- **Diet Type:** {nutrition.diet_type}\n"
+            f"- **Calories:** {nutrition.daily_calories} kcal\n"
+            f"- **Macros:** {nutrition.macros}\n"
+            f"- **Hydration:** {nutrition.hydration_tips}\n"
+            "**\nMeal Suggestions:**\n"
+        )
+        for meal in nutrition.meal_suggestions:
+            yield f"- {meal}\n"
+        yield "\n\n"
+
+    # Resources Section
+    resources = state.get("resources", [])
+    if resources:
+        yield "\n## Recommended Resources\n"
+        include_youtube = state.get("include_youtube", False)
+        for res in resources:
+            if include_youtube:
+                yield f"- [{res.title}]({res.url})\n"
+            for tip in res.key_tips:
+                yield f"  - *Tip:* {tip}\n"
+        yield "\n"
+
+    yield f"\n\n## Schedule Notes\n{schedule.notes}\n\n"
+    for workout in schedule.workouts:
+        lines = [f"## {workout.day} ({workout.duration})\n"]
+        lines += [f"- {exercise}\n" for exercise in workout.exercises]
+        yield "".join(lines) + "\n"
+
+    # Program phases are written in their compact form; weeks can be expanded on demand
+    program = state.get("program")
+    if program:
+        yield f"\n## Long-Term Program ({program.total_weeks} weeks)\n\n"
+        for phase in program.phases:
+            end_week = phase.start_week + phase.weeks - 1
+            lines = [
+                f"### {phase.name} (Weeks {phase.start_week}-{end_week})\n",
+                f"**Focus:** {phase.focus}\n",
+                f"**Progression:** {phase.progression}\n",
+            ]
+            if phase.deload_last_week:
+                lines.append("**Deload:** last week of the phase\n")
+            for workout in phase.workouts:
+                lines.append(f"- **{workout.day}** ({workout.duration}): {', '.join(workout.exercises)}\n")
+            yield "".join(lines) + "\n"
+
+
+def iter_json(state):
+    """Yields the plan as a JSON document."""
+    profile = state.get("profile")
+    nutrition = state.get("nutrition")
+    program = state.get("program")
+    plan = {
+        "profile": profile.model_dump() if profile else None,
+        "schedule": state["schedule"].model_dump(),
+        "nutrition": nutrition.model_dump() if nutrition else None,
+        "program": program.model_dump() if program else None,
+        "resources": [r.model_dump() for r in state.get("resources", [])],
+    }
+    yield json.dumps(plan, indent=2)
+    yield "\n"
+
+
+def _parse_minutes(duration: str, default: int) -> int:
+    match = re.search(r"\d+", duration or "")
+    return int(match.group()) if match else default
+
+
+def _ics_escape(text: str) -> str:
+    return (
+        str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def _ics_line(name: str, value: str) -> str:
+    """Builds a content line folded at 75 octets with CRLF + space (RFC 5545 section 3.1)."""
+    line = f"{name}:{value}".encode("utf-8")
+    chunks = []
+    limit = 75
+    while len(line) > limit:
+        cut = limit
+        # Never split a multi-byte UTF-8 character
+        while cut > 0 and (line[cut] & 0xC0) == 0x80:
+            cut -= 1
+        chunks.append(line[:cut])
+        line = line[cut:]
+        limit = 74  # Continuation lines start with a space
+    chunks.append(line)
+    return "\r\n ".join(c.decode("utf-8") for c in chunks) + "\r\n"
+
+
+def iter_ics(state, thread_id: str = None, start: date = None, hour: int = 7):
+    """Yields the plan as an iCalendar file with weekly recurring workout events.
+
+    With a program, each phase gets its own events, starting in the phase's first
+    week and repeating for exactly `phase.weeks` weeks. Without one, the weekly
+    schedule repeats with no end date. Workouts named after a weekday recur on that
+    day. Generic names like 'Day 1' are spread over the following days, starting
+    from `start` (default: next Monday). UIDs are derived from thread_id so
+    re-importing an updated plan replaces events instead of duplicating them.
+    """
+    schedule = state["schedule"]
+    profile = state.get("profile")
+    program = state.get("program")
+    default_minutes = profile.time_per_day if profile else 30
+    if start is None:
+        today = date.today()
+        start = today + timedelta(days=(7 - today.weekday()) % 7 or 7)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    # (label, workouts, first week offset, number of weeks or None for open-ended)
+    if program:
+        blocks = [(p.name, p.workouts, p.start_week - 1, p.weeks) for p in program.phases]
+    else:
+        blocks = [(None, schedule.workouts, 0, None)]
+
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//AI Fitness Coach//Workout Plan//EN\r\n"
+    for block_index, (label, workouts, week_offset, weeks) in enumerate(blocks):
+        block_start = start + timedelta(weeks=week_offset)
+        used_days = set()
+        for index, workout in enumerate(workouts):
+            name = workout.day.lower()
+            weekday = next((i for i, d in enumerate(WEEKDAYS) if d in name), None)
+            if weekday is None:
+                weekday = next((i for i in range(index, index + 7) if i % 7 not in used_days), index) % 7
+            used_days.add(weekday)
+
+            day = block_start + timedelta(days=(weekday - block_start.weekday()) % 7)
+            begin = datetime(day.year, day.month, day.day, hour)
+            end = begin + timedelta(minutes=_parse_minutes(workout.duration, default_minutes))
+            uid = uuid.uuid5(uuid.NAMESPACE_URL, f"ai-fitness-coach/{thread_id or 'default'}/{block_index}/{index}")
+            rrule = f"FREQ=WEEKLY;BYDAY={ICS_DAYS[weekday]}" + (f";COUNT={weeks}" if weeks else "")
+            summary = f"Workout - {workout.day}" + (f" ({label})" if label else "")
+            yield (
+                "BEGIN:VEVENT\r\n"
+                f"UID:{uid}@ai-fitness-coach\r\n"
+                f"DTSTAMP:{stamp}\r\n"
+                f"DTSTART:{begin.strftime('%Y%m%dT%H%M%S')}\r\n"
+                f"DTEND:{end.strftime('%Y%m%dT%H%M%S')}\r\n"
+                f"RRULE:{rrule}\r\n"
+                + _ics_line("SUMMARY", _ics_escape(summary))
+                + _ics_line("DESCRIPTION", _ics_escape("\n".join(workout.exercises)))
+                + "END:VEVENT\r\n"
+            )
+    yield "END:VCALENDAR\r\n"
+
+
+RENDERERS = {"md": iter_markdown, "json": iter_json, "ics": iter_ics}
+
+
+def write_plan(state, fp, fmt: str = "md", thread_id: str = None):
+    """Streams the plan in the given format to an open text file or buffer."""
+    chunks = iter_ics(state, thread_id=thread_id) if fmt == "ics" else RENDERERS[fmt](state)
+    for chunk in chunks:
+        fp.write(chunk)
+
+
+def render_plan(state, fmt: str = "md", thread_id: str = None) -> str:
+    """Renders the plan into an in-memory buffer (e.g. for download buttons)."""
+    buffer = io.StringIO()
+    write_plan(state, buffer, fmt, thread_id)
+    return buffer.getvalue()
+
+
+def write_atomic(path: str, write):
+    """Calls write(fp) on a temp file next to `path`, then moves it into place.
+
+    Readers never see a partially written file, and the temp file is removed if
+    writing fails.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def save_plan_files(state, thread_id: str, formats=("md", "json", "ics")) -> list:
+    """Atomically writes the plan for a thread in each format and returns the paths."""
+    paths = []
+    for fmt in formats:
+        path = plan_path(thread_id, fmt)
+        write_atomic(path, lambda f: write_plan(state, f, fmt, thread_id))
+        paths.append(path)
+    return paths
@@ -1,5 +1,5 @@
 from typing import List, Optional, TypedDict, Annotated
-from models import UserProfile, ExerciseResource, WeeklySchedule, Assessment, NutritionPlan
+from models import UserProfile, ExerciseResource, WeeklySchedule, Assessment, NutritionPlan, Program
 import operator
 
 class AgentState(TypedDict):
@@ -7,6 +7,7 @@ class AgentState(TypedDict):
     profile: Optional[UserProfile]
     resources: Annotated[List[ExerciseResource], operator.add] # Append resources if needed
     schedule: Optional[WeeklySchedule]
+    program: Optional[Program] # Multi-week periodized program
     assessment: Optional[Assessment] # Feasibility check result
     nutrition: Optional[NutritionPlan] # Nutrition plan
     feedback: Optional[str] # User feedback for modifications
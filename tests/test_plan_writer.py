@@ -0,0 +1,114 @@
+import os
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+import plan_writer
+from plan_writer import _ics_line, iter_ics, plan_path, render_plan, save_plan_files
+
+
+def _workout(day, exercises=("Pullups 3x5",), duration="30 mins"):
+    return SimpleNamespace(day=day, exercises=list(exercises), duration=duration)
+
+
+def _state(program=None):
+    return {
+        "profile": SimpleNamespace(goal="1 muscleup", time_per_day=30),
+        "schedule": SimpleNamespace(
+            workouts=[_workout("Monday"), _workout("Day 2")], notes="Go", estimated_time="3 months"
+        ),
+        "nutrition": None,
+        "resources": [],
+        "program": program,
+    }
+
+
+def _unfold(text):
+    return text.replace("\r\n ", "")
+
+
+def test_ics_line_short_is_unchanged():
+    assert _ics_line("SUMMARY", "Workout") == "SUMMARY:Workout\r\n"
+
+
+def test_ics_line_folds_at_75_octets():
+    folded = _ics_line("DESCRIPTION", "x" * 200)
+    lines = folded[:-2].split("\r\n")
+    assert len(lines[0].encode()) == 75
+    assert all(line.startswith(" ") and len(line.encode()) <= 75 for line in lines[1:])
+    assert _unfold(folded) == "DESCRIPTION:" + "x" * 200 + "\r\n"
+
+
+@pytest.mark.parametrize("padding", range(60, 66))
+def test_ics_line_never_splits_multibyte_characters(padding):
+    # Shift 'é'/'€' across the 75-octet boundary
+    value = "a" * padding + "é€" * 20
+    folded = _ics_line("DESCRIPTION", value)
+    for line in folded[:-2].split("\r\n"):
+        assert len(line.encode("utf-8")) <= 75
+    assert _unfold(folded) == f"DESCRIPTION:{value}\r\n"
+
+
+def test_plan_path_sanitizes_thread_id(monkeypatch, tmp_path):
+    monkeypatch.setattr(plan_writer, "PLAN_OUTPUT_DIR", str(tmp_path))
+    path = plan_path("../../etc/passwd", "json")
+    assert os.path.dirname(os.path.dirname(path)) == str(tmp_path)
+    assert path.endswith("workout_plan.json")
+    assert ".." not in os.path.relpath(path, tmp_path)
+    assert plan_path("", "md") == os.path.join(str(tmp_path), "default", "workout_plan.md")
+
+
+def test_save_plan_files_writes_each_format(monkeypatch, tmp_path):
+    monkeypatch.setattr(plan_writer, "PLAN_OUTPUT_DIR", str(tmp_path))
+    paths = save_plan_files(_state(), "t1", formats=("md", "ics"))
+    assert [os.path.basename(p) for p in paths] == ["workout_plan.md", "workout_plan.ics"]
+    with open(paths[0], encoding="utf-8") as f:
+        assert f.read() == render_plan(_state(), "md")
+
+
+def test_save_plan_files_cleans_up_on_failure(monkeypatch, tmp_path):
+    monkeypatch.setattr(plan_writer, "PLAN_OUTPUT_DIR", str(tmp_path))
+    save_plan_files(_state(), "t1", formats=("md",))
+    path = plan_path("t1", "md")
+    with open(path, encoding="utf-8") as f:
+        previous = f.read()
+
+    def broken(state):
+        yield "# partial"
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(plan_writer.RENDERERS, "md", broken)
+    with pytest.raises(RuntimeError):
+        save_plan_files(_state(), "t1", formats=("md",))
+    assert os.listdir(os.path.dirname(path)) == ["workout_plan.md"]
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == previous
+
+
+def test_ics_without_program_repeats_schedule():
+    ics = _unfold("".join(iter_ics(_state(), thread_id="t1", start=date(2026, 1, 5))))
+    assert ics.count("BEGIN:VEVENT") == 2
+    assert "RRULE:FREQ=WEEKLY;BYDAY=MO\r\n" in ics
+    assert "COUNT=" not in ics
+
+
+def test_ics_bounds_each_program_phase():
+    program = SimpleNamespace(total_weeks=10, phases=[
+        SimpleNamespace(name="Base", start_week=1, weeks=4, workouts=[_workout("Monday")]),
+        SimpleNamespace(name="Peak", start_week=5, weeks=6, workouts=[_workout("Wednesday")]),
+    ])
+    ics = _unfold("".join(iter_ics(_state(program), thread_id="t1", start=date(2026, 1, 5))))
+    assert "DTSTART:20260105T070000\r\nDTEND:20260105T073000\r\nRRULE:FREQ=WEEKLY;BYDAY=MO;COUNT=4" in ics
+    assert "DTSTART:20260204T070000\r\nDTEND:20260204T073000\r\nRRULE:FREQ=WEEKLY;BYDAY=WE;COUNT=6" in ics
+    assert "SUMMARY:Workout - Wednesday (Peak)" in ics
+
+
+def test_ics_uids_are_stable_per_thread():
+    def uids(thread_id):
+        ics = "".join(iter_ics(_state(), thread_id=thread_id))
+        return [line for line in ics.split("\r\n") if line.startswith("UID:")]
+
+    assert uids("t1") == uids("t1")
+    assert uids("t1") != uids("t2")
+    assert len(set(uids("t1"))) == 2
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import pytest
+
+from models import DailyWorkout, Program, ProgramPhase
+from nodes.progression import MAX_PROGRAM_WEEKS, _fit_phases, estimate_weeks, expand_week
+
+
+@pytest.mark.parametrize("estimated_time, weeks", [
+    ("8-10 weeks", 10),
+    ("4-5 months", 22),
+    ("2.5-3.5 months", 15),
+    ("1 year and 6 months", 78),
+    ("6 months to 1 year", 52),
+    ("6-8 weeks at 3 days/week", 8),
+    ("5 weeks, training 4 days per week", 5),
+    ("about a year", 52),
+    ("a month", 4),
+    ("10 days", 1),
+])
+def test_estimate_weeks(estimated_time, weeks):
+    assert estimate_weeks(estimated_time) == weeks
+
+
+def test_estimate_weeks_is_capped():
+    assert estimate_weeks("3 years") == MAX_PROGRAM_WEEKS
+
+
+@pytest.mark.parametrize("estimated_time", ["", None, "soon", "it depends"])
+def test_estimate_weeks_default(estimated_time):
+    assert estimate_weeks(estimated_time, default=12) == 12
+
+
+def _outline(weeks):
+    return SimpleNamespace(name=f"{weeks}w", weeks=weeks, focus="")
+
+
+def test_fit_phases_stretches_last_phase():
+    fitted = _fit_phases([_outline(4), _outline(4)], 10)
+    assert [(start, weeks) for _, start, weeks in fitted] == [(1, 4), (5, 6)]
+
+
+def test_fit_phases_trims_overflow_and_drops_empty():
+    fitted = _fit_phases([_outline(0), _outline(6), _outline(6), _outline(6)], 8)
+    assert [(start, weeks) for _, start, weeks in fitted] == [(1, 6), (7, 2)]
+
+
+def _program():
+    base = [DailyWorkout(day="Monday", exercises=["Pullups 3x5"], duration="30 mins")]
+    peak = [DailyWorkout(day="Wednesday", exercises=["Muscleup negatives 3x3"], duration="40 mins")]
+    return Program(total_weeks=10, phases=[
+        ProgramPhase(name="Base", focus="Strength", start_week=1, weeks=4, workouts=base,
+                     progression="+1 rep per set", deload_last_week=True),
+        ProgramPhase(name="Peak", focus="Skill", start_week=5, weeks=6, workouts=peak,
+                     progression="+1 set"),
+    ])
+
+
+@pytest.mark.parametrize("week, phase, week_in_phase", [
+    (1, "Base", "1/4"),
+    (3, "Base", "3/4"),
+    (5, "Peak", "1/6"),
+    (10, "Peak", "6/6"),
+])
+def test_expand_week_maps_weeks_to_phases(week, phase, week_in_phase):
+    program = _program()
+    expanded = expand_week(program, week)
+    template = next(p for p in program.phases if p.name == phase)
+    assert expanded.workouts == template.workouts
+    assert expanded.notes.startswith(f"{phase} - Week {week_in_phase}")
+    assert expanded.estimated_time == f"Week {week} of 10"
+
+
+def test_expand_week_progression_step():
+    assert "Progression step 2: +1 rep per set" in expand_week(_program(), 3).notes
+
+
+def test_expand_week_deload():
+    assert "(deload)" in expand_week(_program(), 4).notes
+    # Phases without deload keep progressing in their last week
+    assert "(deload)" not in expand_week(_program(), 10).notes
+
+
+@pytest.mark.parametrize("week", [0, 11, -1])
+def test_expand_week_out_of_range(week):
+    with pytest.raises(ValueError):
+        expand_week(_program(), week)
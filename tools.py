@@ -4,6 +4,7 @@ import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 import warnings
+from plan_writer import plan_path, write_atomic
 
 load_dotenv()
 # For suppressing LangChain deprecation warnings
@@ -33,11 +34,11 @@ def scrape_content(url: str) -> str:
 
 
 @tool
-def save_workout_plan(content: str, filename: str = "workout_plan.md") -> str:
-    """Save the generated workout plan to a local file."""
+def save_workout_plan(content: str, thread_id: str, fmt: str = "md") -> str:
+    """Save already rendered plan content to this thread's plan file."""
     try:
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(content)
-        return f"Successfully saved plan to {filename}"
+        path = plan_path(thread_id, fmt)
+        write_atomic(path, lambda f: f.write(content))
+        return f"Successfully saved plan to {path}"
     except Exception as e:
         return f"Error saving file: {str(e)}"